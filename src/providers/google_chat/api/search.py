@@ -189,7 +189,9 @@ async def search_messages(
 
     # Now apply the actual search filtering based on the chosen search mode
     logger.info(f"Applying {search_mode} search to {len(all_messages)} messages")
-    results = search_manager.search(query, all_messages, mode=search_mode)
+    # Non-positive max_results keep their slicing meaning below, so only bound the ranking when positive
+    top_k = max_results if max_results > 0 else None
+    results = search_manager.search(query, all_messages, mode=search_mode, top_k=top_k)
 
     # Only limit the final results returned to the user, not the messages we search through
     final_messages = [msg for _, msg in results[:max_results]]
@@ -148,3 +148,26 @@ async def test_regex_enforces_strict_date_filtering():
         assert len(result["messages"]) == 0
         assert mock_list_messages.call_count == 1
         search_mgr.search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_non_positive_max_results_does_not_bound_ranking():
+    """A negative max_results keeps its slicing meaning instead of being passed on as top_k."""
+    with patch("src.providers.google_chat.api.search.list_space_messages", new_callable=AsyncMock) as mock_list_messages:
+        mock_list_messages.return_value = {"messages": [MSG_OLD, MSG_RECENT]}
+
+        with patch("src.providers.google_chat.api.search.SearchManager") as mock_mgr:
+            search_mgr = MagicMock()
+            mock_mgr.return_value = search_mgr
+            search_mgr.search.return_value = [(0.9, MSG_RECENT), (0.8, MSG_OLD)]
+            search_mgr.get_default_mode.return_value = "exact"
+
+            result = await search_messages(
+                query="financial",
+                search_mode="exact",
+                spaces=[SPACE],
+                max_results=-1
+            )
+
+        assert search_mgr.search.call_args.kwargs["top_k"] is None
+        assert [msg["name"] for msg in result["messages"]] == [MSG_RECENT["name"]]
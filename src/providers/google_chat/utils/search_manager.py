@@ -1,15 +1,26 @@
 """
 Search Manager - Text-based message searching (exact and regex modes)
 """
+import bisect
+import copy
+import functools
+import heapq
+import itertools
 import logging
+import operator
 import os
 import re
 import unicodedata
-from collections import defaultdict
-from typing import Optional
+from types import MappingProxyType
+from typing import Optional, Union
 
 import yaml
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 from src.mcp_core.engine.provider_loader import get_provider_config_value
 
 # Provider name
@@ -25,6 +36,244 @@ SEARCH_CONFIG_YAML_PATH = get_provider_config_value(
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("search_manager")
 
+# Smart quotes are folded to their ASCII forms so contractions and quoted text match
+_SMART_QUOTES = (('\u2019', "'"), ('\u2018', "'"), ('\u201c', '"'), ('\u201d', '"'))
+
+
+def _build_contractions() -> MappingProxyType:
+    """Build the exact-mode contraction mappings (both directions), once at import time."""
+    # Define contraction mappings (both directions)
+    contraction_pairs = {
+        "don't": ["didn't", "do not", "did not"],
+        "didn't": ["don't", "did not", "do not"],
+        "isn't": ["wasn't", "is not", "was not"],
+        "wasn't": ["isn't", "was not", "is not"],
+        "can't": ["couldn't", "cannot", "could not"],
+        "couldn't": ["can't", "could not", "cannot"],
+        "won't": ["wouldn't", "will not", "would not"],
+        "wouldn't": ["won't", "would not", "will not"],
+        "aren't": ["weren't", "are not", "were not"],
+        "weren't": ["aren't", "were not", "are not"],
+        "haven't": ["hadn't", "have not", "had not"],
+        "hadn't": ["haven't", "had not", "have not"]
+    }
+
+    # For expanded forms, create reverse mapping to contracted forms
+    expanded_to_contraction = {}
+    for contraction, variants in contraction_pairs.items():
+        for variant in variants:
+            if " " in variant:  # Only add expanded forms
+                if variant not in expanded_to_contraction:
+                    expanded_to_contraction[variant] = []
+                expanded_to_contraction[variant].append(contraction)
+
+    # Add expanded forms to contraction pairs for lookup
+    contraction_pairs.update(expanded_to_contraction)
+    return MappingProxyType({key: tuple(variants) for key, variants in contraction_pairs.items()})
+
+
+# Exact mode: contraction or expanded form -> forms to also search for
+_CONTRACTION_PAIRS = _build_contractions()
+_CONTRACTION_KEYS_LOWER = frozenset(key.lower() for key in _CONTRACTION_PAIRS)
+# Preserves the mapping order when several contractions appear in one query
+_CONTRACTION_ORDER = MappingProxyType({key: order for order, key in enumerate(_CONTRACTION_PAIRS)})
+# Words in a query, keeping inner apostrophes ("don't")
+_WORD_RE = re.compile(r"\b[\w']+\b")
+
+# Regex mode: contraction -> every form it should match
+_REGEX_CONTRACTION_TERMS = {
+    "don't": ["didn't", "don't", "do not", "did not"],
+    "didn't": ["don't", "didn't", "did not", "do not"],
+    "isn't": ["wasn't", "isn't", "is not", "was not"],
+    "wasn't": ["isn't", "wasn't", "was not", "is not"],
+    "can't": ["couldn't", "can't", "cannot", "could not"],
+    "couldn't": ["can't", "couldn't", "could not", "cannot"],
+    "won't": ["wouldn't", "won't", "will not", "would not"],
+    "wouldn't": ["won't", "wouldn't", "would not", "will not"]
+}
+
+
+def _build_regex_contraction_subs() -> dict[str, tuple[re.Pattern, str]]:
+    """Precompute, per contraction, its matcher and the OR-pattern that replaces it."""
+    subs = {}
+    for contraction, alternatives in _REGEX_CONTRACTION_TERMS.items():
+        parts = []
+        for alt in alternatives:
+            if "'" in alt:
+                # For variants with apostrophes, make the apostrophe optional
+                parts.append(alt.replace("'", "['']?"))
+            else:
+                parts.append(re.escape(alt))
+        # Combine alternatives with OR
+        pattern_part = "(" + "|".join(parts) + ")"
+        subs[contraction.lower()] = (re.compile(re.escape(contraction), re.IGNORECASE), pattern_part)
+    return subs
+
+
+_REGEX_CONTRACTION_SUBS = _build_regex_contraction_subs()
+
+# Python and PCRE disagree on these: \s/\S/\w/\W classes (e.g. "\x1c"-"\x1f" are
+# whitespace to Python), POSIX "[:class:]" syntax, and "{,n}" (a quantifier to Python)
+_HYPERSCAN_UNSAFE_RE = re.compile(r"\\[sSwW]|\[:|\{,")
+# Compiling a Hyperscan database can take far longer than scanning a few messages with re
+_HYPERSCAN_MIN_MESSAGES = 2000
+# Regex scores count at most this many matches per message
+_MAX_SCORED_MATCHES = 5
+# Separates message texts in the joined regex corpus
+_CORPUS_SEPARATOR = "\x1e"
+# Anchors, lookarounds and inline flags behave differently once messages are joined
+_CORPUS_UNSAFE_RE = re.compile(r"(?<!\[)\^|\$|\\[AZ]|\(\?(?![:P])")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str, flags: int) -> re.Pattern:
+    """Compile a regex pattern, reusing previously compiled patterns."""
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_hyperscan(pattern: str, flags: int) -> Optional["hyperscan.Database"]:
+    """
+    Compile a Hyperscan prefilter database for a Python regex pattern.
+
+    Prefilter mode matches a superset of what the pattern matches on ASCII text, so
+    ASCII messages it rejects can be skipped and the rest are confirmed with re.
+    Only ASCII patterns without constructs whose meaning differs between Python and
+    PCRE are accepted (see _HYPERSCAN_UNSAFE_RE).
+
+    Returns:
+        the database, or None if Hyperscan is not installed or cannot handle the pattern
+    """
+    if hyperscan is None or not pattern.isascii() or _HYPERSCAN_UNSAFE_RE.search(pattern):
+        return None
+
+    hs_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_ALLOWEMPTY
+    if flags & re.IGNORECASE:
+        hs_flags |= hyperscan.HS_FLAG_CASELESS
+    if flags & re.DOTALL:
+        hs_flags |= hyperscan.HS_FLAG_DOTALL
+
+    database = hyperscan.Database()
+    try:
+        database.compile(expressions=[pattern.encode('ascii')], ids=[0], elements=1, flags=[hs_flags])
+    except hyperscan.error as e:
+        logger.debug("Hyperscan cannot compile '%s': %s", pattern, e)
+        return None
+    return database
+
+
+def _on_hyperscan_match(expression_id: int, start: int, end: int, flags: int, found: list):
+    """Hyperscan match callback: record the match (HS_FLAG_SINGLEMATCH reports at most one)."""
+    found.append(end)
+
+
+@functools.lru_cache(maxsize=64)
+def _alternatives_overlap(alternatives: tuple) -> bool:
+    """Return whether an occurrence of one alternative can overlap an occurrence of another."""
+    for alt_index, alt_query in enumerate(alternatives):
+        for other in alternatives[alt_index + 1:]:
+            if alt_query in other or other in alt_query:
+                return True
+            # A suffix of one that is a prefix of the other lets the two occurrences share text
+            for size in range(1, min(len(alt_query), len(other))):
+                if alt_query.endswith(other[:size]) or other.endswith(alt_query[:size]):
+                    return True
+    return False
+
+
+def _match_alternatives(alternatives: list, text,
+                        overlapping: Optional[bool] = None) -> Optional[tuple[int, int, int]]:
+    """
+    Find the leftmost occurrence of any alternative in text; works on str or bytes.
+
+    At the same position, earlier alternatives win, as in a regex alternation, and
+    occurrences are counted without overlaps across all alternatives.
+    overlapping is _alternatives_overlap(alternatives), computed here if not given.
+
+    Returns:
+        tuple (alternative index, non-overlapping match count of all alternatives, first_index),
+        or None if no alternative matches
+    """
+    if len(alternatives) == 1:
+        alt_query = alternatives[0]
+        first_index = text.find(alt_query)
+        if first_index < 0:
+            return None
+        # Nothing before the first match needs to be counted again
+        return 0, text.count(alt_query, first_index), first_index
+
+    # Texts without any alternative are ruled out by containment checks alone
+    for alt_index, alt_query in enumerate(alternatives):
+        if alt_query in text:
+            break
+    else:
+        return None
+
+    if overlapping is None:
+        overlapping = _alternatives_overlap(tuple(alternatives))
+    if not overlapping:
+        # Occurrences of different alternatives never share text, so each one is counted on its own.
+        # Earlier alternatives do not occur; later ones may still occur before this one.
+        first_index = text.find(alt_query)
+        match_count = text.count(alt_query, first_index)
+        for other_index, other in enumerate(alternatives[alt_index + 1:], alt_index + 1):
+            if other in text:
+                index = text.find(other)
+                match_count += text.count(other, index)
+                if index < first_index:
+                    alt_index, first_index = other_index, index
+        return alt_index, match_count, first_index
+
+    # Next occurrence of each alternative, or -1 once it no longer occurs
+    next_index = [text.find(alt_query) for alt_query in alternatives]
+
+    first = None
+    match_count = 0
+    pos = 0
+    while True:
+        best_index = best_alt = -1
+        for alt_index, index in enumerate(next_index):
+            if 0 <= index < pos:
+                # Overlapped by the previous match; look again after it
+                index = next_index[alt_index] = text.find(alternatives[alt_index], pos)
+            if index >= 0 and (best_index < 0 or index < best_index):
+                best_index, best_alt = index, alt_index
+        if best_index < 0:
+            break
+        if first is None:
+            first = (best_alt, best_index)
+        match_count += 1
+        pos = best_index + len(alternatives[best_alt])
+    return first[0], match_count, first[1]
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime: float) -> dict:
+    """Parse a YAML file; mtime is part of the cache key so edits are picked up."""
+    with open(path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def _rank(results: list[tuple[float, dict]], top_k: Optional[int] = None) -> list[tuple[float, dict]]:
+    """Sort (score, message) results by score (descending), keeping only the top_k when given."""
+    if top_k is None:
+        results.sort(key=lambda x: x[0], reverse=True)
+        return results
+    # Stable like the full sort, but O(N log K)
+    return heapq.nlargest(top_k, results, key=lambda x: x[0])
+
+
+def _normalize(text: str) -> str:
+    """Normalize Unicode text (NFKD) and replace smart quotes with ASCII ones."""
+    # ASCII text is already in NFKD form and has no smart quotes
+    if text.isascii():
+        return text
+    normalized = unicodedata.normalize('NFKD', text)
+    # str.replace stays in C, while str.translate with a dict table looks up every character
+    for smart_quote, ascii_quote in _SMART_QUOTES:
+        normalized = normalized.replace(smart_quote, ascii_quote)
+    return normalized
+
 
 class SearchManager:
     """Manages search operations using exact and regex matching."""
@@ -34,6 +283,12 @@ class SearchManager:
         logger.info(f"Initializing SearchManager with config: {config_path}")
         self.config = self._load_config(config_path)
         self.search_modes = {}
+        # (texts, normalized texts, lowered or None until needed) of the last searched messages
+        self._soa: Optional[tuple[list[str], list[str], Optional[list[str]]]] = None
+        # Joined normalized texts used by regex search, and the normalized column they were built from
+        self._corpus_source: Optional[list[str]] = None
+        self._corpus_text = ""
+        self._corpus_offsets: list[int] = []
         self._initialize_search_modes()
 
     def _load_config(self, config_path: str) -> dict:
@@ -42,8 +297,8 @@ class SearchManager:
             logger.error(f"Search configuration file not found: {config_path}")
             raise FileNotFoundError(f"Search configuration file not found: {config_path}")
 
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # Parsed once per file version; callers get their own copy to mutate
+        config = copy.deepcopy(_load_yaml(config_path, os.path.getmtime(config_path)))
         logger.info(f"Loaded configuration with {len(config.get('search_modes', []))} search modes")
         return config
 
@@ -58,6 +313,24 @@ class SearchManager:
                 self.search_modes[mode['name']] = mode
                 logger.info(f"Enabled search mode: {mode['name']}")
 
+    def _as_soa(self, messages: list[dict], lowered: bool = True) -> tuple[list[str], list[str], Optional[list[str]]]:
+        """
+        Return parallel lists (texts, normalized texts, lowered) for messages.
+
+        Built once per search and passed to the scans, so the search loops index lists
+        instead of looking up message dict fields. The normalized columns of the previous
+        search are reused while every message still holds the same text object.
+        The lowered column is only built when lowered is True (it may be None otherwise).
+        """
+        texts = [msg.get("text", "") for msg in messages]
+        cached = self._soa
+        # An edited or replaced message holds a different str object
+        if cached is None or len(cached[0]) != len(texts) or not all(map(operator.is_, cached[0], texts)):
+            cached = self._soa = (texts, [_normalize(text) for text in texts], None)
+        if lowered and cached[2] is None:
+            cached = self._soa = (cached[0], cached[1], [text.lower() for text in cached[1]])
+        return cached
+
     def get_default_mode(self) -> str:
         """Get the default search mode from configuration."""
         default = self.config.get('search', {}).get('default_mode', 'exact')
@@ -67,7 +340,8 @@ class SearchManager:
         logger.info(f"Using default search mode: {default}")
         return default
 
-    def search(self, query: str, messages: list[dict], mode: Optional[str] = None) -> list[tuple[float, dict]]:
+    def search(self, query: str, messages: list[dict], mode: Optional[str] = None,
+               top_k: Optional[int] = None) -> list[tuple[float, dict]]:
         """
         Search messages using the specified mode.
 
@@ -76,6 +350,7 @@ class SearchManager:
             messages: list of message objects to search through
             mode: Search mode (exact, regex, hybrid)
                   If None, uses the default mode from config
+            top_k: If given, only the top_k highest scoring results are returned
 
         Returns:
             list of tuples (score, message) sorted by relevance score (descending)
@@ -94,146 +369,126 @@ class SearchManager:
         # Verify mode exists in config
         if mode != "hybrid" and mode not in self.search_modes:
             logger.error(f"Search mode '{mode}' not found in configuration or not enabled")
-            return self._exact_search(query, messages)
+            return self._exact_search(query, messages, top_k)
 
         if mode == "hybrid":
             logger.info("Using hybrid search mode (exact + regex)")
-            return self._hybrid_search(query, messages)
+            return self._hybrid_search(query, messages, top_k)
         elif mode == "exact":
             logger.info("Using exact search mode")
-            return self._exact_search(query, messages)
+            return self._exact_search(query, messages, top_k)
         elif mode == "regex":
             logger.info("Using regex search mode")
-            return self._regex_search(query, messages)
+            return self._regex_search(query, messages, top_k)
         else:
             logger.error(f"Unknown search mode: {mode}")
             raise ValueError(f"Unknown search mode: {mode}")
 
-    def _exact_search(self, query: str, messages: list[dict]) -> list[tuple[float, dict]]:
-        """Perform exact (case-insensitive substring) matching."""
-        results = []
+    def _exact_search(self, query: str, messages: list[dict], top_k: Optional[int] = None,
+                      positional: bool = False, columns: Optional[tuple[list[str], list[str], list[str]]] = None
+                      ) -> Union[list[tuple[float, dict]], tuple[list[float], list[int]]]:
+        """
+        Perform exact (case-insensitive substring) matching.
+
+        If positional is True, returns parallel (scores, message indexes) lists in message order instead.
+        columns are the message columns from _as_soa, built here if not given.
+        """
+        scores = []
+        indices_found = []
         # Normalize the query to handle Unicode characters like smart quotes
-        normalized_query = unicodedata.normalize('NFKD', query)
-        # Explicitly replace smart apostrophes with standard ASCII apostrophes
-        normalized_query = normalized_query.replace('\u2019', "'").replace('\u2018', "'")
+        normalized_query = _normalize(query)
         query_lower = normalized_query.lower()
         weight = self.search_modes.get("exact", {}).get("weight", 1.0)
 
         logger.info(f"Exact search normalized query: '{query}' -> '{normalized_query}' -> '{query_lower}'")
 
-        # Define contraction mappings (both directions)
-        contraction_pairs = {
-            "don't": ["didn't", "do not", "did not"],
-            "didn't": ["don't", "did not", "do not"],
-            "isn't": ["wasn't", "is not", "was not"],
-            "wasn't": ["isn't", "was not", "is not"],
-            "can't": ["couldn't", "cannot", "could not"],
-            "couldn't": ["can't", "could not", "cannot"],
-            "won't": ["wouldn't", "will not", "would not"],
-            "wouldn't": ["won't", "would not", "will not"],
-            "aren't": ["weren't", "are not", "were not"],
-            "weren't": ["aren't", "were not", "are not"],
-            "haven't": ["hadn't", "have not", "had not"],
-            "hadn't": ["haven't", "had not", "have not"]
-        }
-
-        # For expanded forms, create reverse mapping to contracted forms
-        expanded_to_contraction = {}
-        for contraction, variants in contraction_pairs.items():
-            for variant in variants:
-                if " " in variant:  # Only add expanded forms
-                    if variant not in expanded_to_contraction:
-                        expanded_to_contraction[variant] = []
-                    expanded_to_contraction[variant].append(contraction)
-
-        # Add expanded forms to contraction pairs for lookup
-        contraction_pairs.update(expanded_to_contraction)
-
         # Create alternative forms to search for
         alternatives = [query_lower]
 
-        # Check for contractions in the query
-        for contraction, variants in contraction_pairs.items():
-            if contraction.lower() in query_lower:
-                # Replace the contraction with each alternative
-                for variant in variants:
-                    alt_query = query_lower.replace(contraction.lower(), variant.lower())
-                    if alt_query != query_lower and alt_query not in alternatives:
-                        alternatives.append(alt_query)
+        # Check for contractions in the query: single words and two-word expanded forms
+        query_tokens = _WORD_RE.findall(query_lower)
+        query_terms = set(query_tokens)
+        query_terms.update(" ".join(pair) for pair in zip(query_tokens, query_tokens[1:]))
+        active = sorted(query_terms & _CONTRACTION_KEYS_LOWER, key=_CONTRACTION_ORDER.__getitem__)
+        for contraction in active:
+            # Replace the contraction with each alternative
+            for variant in _CONTRACTION_PAIRS[contraction]:
+                alt_query = query_lower.replace(contraction, variant.lower())
+                if alt_query != query_lower and alt_query not in alternatives:
+                    alternatives.append(alt_query)
 
         logger.info(f"Exact search with {len(alternatives)} alternatives: {alternatives}")
 
-        for msg in messages:
-            # Normalize the text to handle Unicode characters
-            original_text = msg.get("text", "")
-            normalized_text = unicodedata.normalize('NFKD', original_text)
-            # Explicitly replace smart apostrophes with standard ASCII apostrophes
-            normalized_text = normalized_text.replace('\u2019', "'").replace('\u2018', "'")
-            text = normalized_text.lower()
-
-            # Check each alternative form
-            for alt_query in alternatives:
-                if alt_query in text:
-                    logger.info(f"Found match for '{alt_query}' in: '{text[:100]}...'")
-                    # Basic scoring based on number of matches and position of first match
-                    match_count = text.count(alt_query)
-                    position_factor = 1.0 - (text.find(alt_query) / (len(text) + 1)) if text else 0
-                    score = weight * (0.6 + 0.2 * match_count + 0.2 * position_factor)
-                    # If this isn't the primary query, slightly reduce the score
-                    if alt_query != query_lower:
-                        score *= 0.9  # Slight penalty for alternative matches
-                    results.append((score, msg))
-                    break  # Only count each message once, with the first match
-
+        # Loop-invariant parts of the score: weight * (0.6 + 0.2 * match_count + 0.2 * position_factor)
+        base_score = weight * 0.6
+        factor_weight = weight * 0.2
+
+        # Only alternatives that can overlap need their matches walked one by one
+        overlapping = _alternatives_overlap(tuple(alternatives))
+
+        # Texts shorter than every alternative cannot match; skip them before scanning
+        min_alt_length = min(len(alt_query) for alt_query in alternatives)
+
+        if columns is None or columns[2] is None:
+            columns = self._as_soa(messages)
+        lowered_texts = columns[2]
+        for idx, text in enumerate(lowered_texts):
+            if len(text) < min_alt_length:
+                continue
+
+            match = _match_alternatives(alternatives, text, overlapping)
+
+            if match is not None:
+                alt_index, match_count, first_index = match
+                alt_query = alternatives[alt_index]
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Found match for '%s' in: '%.100s...'", alt_query, text)
+                # Basic scoring based on number of matches and position of first match
+                position_factor = 1.0 - (first_index / (len(text) + 1)) if text else 0
+                score = base_score + factor_weight * (match_count + position_factor)
+                # If this isn't the primary query, slightly reduce the score
+                if alt_query != query_lower:
+                    score *= 0.9  # Slight penalty for alternative matches
+                scores.append(score)
+                indices_found.append(idx)
+
+        if positional:
+            return scores, indices_found
         # Sort by score (descending) using only the score value for comparison
-        results.sort(key=lambda x: x[0], reverse=True)
-        return results
+        return _rank([(score, messages[idx]) for score, idx in zip(scores, indices_found)], top_k)
+
+    def _regex_search(self, query: str, messages: list[dict], top_k: Optional[int] = None,
+                      positional: bool = False, columns: Optional[tuple[list[str], list[str], list[str]]] = None
+                      ) -> Union[list[tuple[float, dict]], tuple[list[float], list[int]]]:
+        """
+        Perform regular expression matching.
 
-    def _regex_search(self, query: str, messages: list[dict]) -> list[tuple[float, dict]]:
-        """Perform regular expression matching."""
-        results = []
+        If positional is True, returns parallel (scores, message indexes) lists in message order instead.
+        columns are the message columns from _as_soa, built here if not given.
+        """
+        if columns is None:
+            # Regex matching folds case itself, so the lowered column is not needed
+            columns = self._as_soa(messages, lowered=False)
+        normalized_texts = columns[1]
+        scores = []
+        indices_found = []
         weight = self.search_modes.get("regex", {}).get("weight", 1.0)
         regex_options = self.search_modes.get("regex", {}).get("options", {})
 
         # Normalize the query to handle Unicode characters like smart quotes
-        normalized_query = unicodedata.normalize('NFKD', query)
-        # Explicitly replace smart apostrophes with standard ASCII apostrophes
-        normalized_query = normalized_query.replace('\u2019', "'").replace('\u2018', "'")
-
-        # Special handling for apostrophes to make search more flexible
-        contraction_terms = {
-            "don't": ["didn't", "don't", "do not", "did not"],
-            "didn't": ["don't", "didn't", "did not", "do not"],
-            "isn't": ["wasn't", "isn't", "is not", "was not"],
-            "wasn't": ["isn't", "wasn't", "was not", "is not"],
-            "can't": ["couldn't", "can't", "cannot", "could not"],
-            "couldn't": ["can't", "couldn't", "could not", "cannot"],
-            "won't": ["wouldn't", "won't", "will not", "would not"],
-            "wouldn't": ["won't", "wouldn't", "would not", "will not"]
-        }
+        normalized_query = _normalize(query)
 
         # Check if we need special handling for contractions
         flexible_query = normalized_query
-        found_contraction = False
-
-        for contraction, alternatives in contraction_terms.items():
-            if contraction.lower() in normalized_query.lower():
-                # Create a pattern that matches all forms
-                parts = []
-                for alt in alternatives:
-                    if "'" in alt:
-                        # For variants with apostrophes, make the apostrophe optional
-                        alt_pattern = alt.replace("'", "['']?")
-                        parts.append(alt_pattern)
-                    else:
-                        parts.append(re.escape(alt))
-
-                # Combine alternatives with OR
-                pattern_part = "(" + "|".join(parts) + ")"
-                flexible_query = re.sub(re.escape(contraction), pattern_part, normalized_query, flags=re.IGNORECASE)
-                found_contraction = True
-                logger.info(f"Regex search with contraction handling: '{query}' -> '{flexible_query}'")
-                break
+        query_lower = normalized_query.lower()
+        contraction = next((c for c in _REGEX_CONTRACTION_SUBS if c in query_lower), None)
+        found_contraction = contraction is not None
+
+        if found_contraction:
+            # Replace the contraction with a pattern that matches all forms
+            contraction_re, pattern_part = _REGEX_CONTRACTION_SUBS[contraction]
+            flexible_query = contraction_re.sub(pattern_part, normalized_query)
+            logger.info(f"Regex search with contraction handling: '{query}' -> '{flexible_query}'")
 
         if not found_contraction:
             # General handling for any apostrophe
@@ -260,80 +515,158 @@ class SearchManager:
                 flexible_query = flexible_query[:max_length]
 
             # First try with the flexible pattern
-            pattern = re.compile(flexible_query, flags)
-
-            for msg in messages:
-                # Normalize the text to handle Unicode characters
-                original_text = msg.get("text", "")
-                normalized_text = unicodedata.normalize('NFKD', original_text)
-                # Explicitly replace smart apostrophes with standard ASCII apostrophes
-                normalized_text = normalized_text.replace('\u2019', "'").replace('\u2018', "'")
-
-                if normalized_text:
-                    matches = list(pattern.finditer(normalized_text))
-                    if matches:
-                        # Score based on number of matches and position of first match
-                        match_count = len(matches)
-                        first_pos = matches[0].start() / len(normalized_text) if matches else 1.0
-                        position_factor = 1.0 - first_pos
-                        score = weight * (0.6 + 0.2 * min(match_count, 5) + 0.2 * position_factor)
-                        results.append((score, msg))
+            pattern = _compile_pattern(flexible_query, flags)
+
+            # Scan all messages in one pass when joining them cannot change the pattern's meaning
+            hits = None
+            if len(messages) >= _HYPERSCAN_MIN_MESSAGES:
+                # Hyperscan rules out non-matching messages without backtracking
+                database = _compile_hyperscan(flexible_query, flags)
+                if database is not None:
+                    candidates = self._hyperscan_candidates(database, normalized_texts)
+                    hits = self._scan_messages(pattern, normalized_texts, candidates)
+            if hits is None and not _CORPUS_UNSAFE_RE.search(flexible_query):
+                hits = self._scan_corpus(pattern, normalized_texts)
+            if hits is None:
+                hits = self._scan_messages(pattern, normalized_texts)
+
+            # Loop-invariant parts of the score
+            base_score = weight * 0.6
+            factor_weight = weight * 0.2
+            for idx, (match_count, first_pos) in hits.items():
+                # Score based on number of matches and position of first match
+                position_factor = 1.0 - first_pos
+                score = base_score + factor_weight * (min(match_count, _MAX_SCORED_MATCHES) + position_factor)
+                scores.append(score)
+                indices_found.append(idx)
         except re.error as e:
             # Log the error and fallback to exact search
             logger.warning(f"Invalid regex pattern '{flexible_query}': {str(e)}. Falling back to exact search.")
-            return self._exact_search(query, messages)
+            return self._exact_search(query, messages, top_k, positional, columns)
 
+        if positional:
+            return scores, indices_found
         # Sort by score (descending) using only the score value for comparison
-        results.sort(key=lambda x: x[0], reverse=True)
-        return results
+        return _rank([(score, messages[idx]) for score, idx in zip(scores, indices_found)], top_k)
+
+    def _regex_corpus(self, texts: list[str]) -> tuple[str, list[int]]:
+        """Return the normalized message texts joined by a separator, and each text's start offset."""
+        # _as_soa returns a new column whenever the message texts change
+        if self._corpus_source is not texts:
+            offsets = []
+            pos = 0
+            for text in texts:
+                offsets.append(pos)
+                pos += len(text) + len(_CORPUS_SEPARATOR)
+            self._corpus_text = _CORPUS_SEPARATOR.join(texts)
+            self._corpus_offsets = offsets
+            self._corpus_source = texts
+        return self._corpus_text, self._corpus_offsets
+
+    def _scan_corpus(self, pattern: re.Pattern,
+                     normalized_texts: list[str]) -> Optional[dict[int, tuple[int, float]]]:
+        """
+        Match a pattern against all normalized message texts with a single scan of the joined corpus.
 
-    def _hybrid_search(self, query: str, messages: list[dict]) -> list[tuple[float, dict]]:
+        Returns:
+            dict mapping message index to (match_count, relative first match position),
+            or None if a match spans more than one message; match_count stops at
+            _MAX_SCORED_MATCHES
+        """
+        corpus, offsets = self._regex_corpus(normalized_texts)
+        hits = {}
+        for match in pattern.finditer(corpus):
+            idx = bisect.bisect_right(offsets, match.start()) - 1
+            start = offsets[idx]
+            end = offsets[idx + 1] - len(_CORPUS_SEPARATOR) if idx + 1 < len(offsets) else len(corpus)
+            if match.end() > end:
+                return None
+            if end == start:
+                continue
+            if idx in hits:
+                match_count, first_pos = hits[idx]
+                if match_count < _MAX_SCORED_MATCHES:
+                    hits[idx] = (match_count + 1, first_pos)
+            else:
+                hits[idx] = (1, (match.start() - start) / (end - start))
+        return hits
+
+    def _scan_messages(self, pattern: re.Pattern, normalized_texts: list[str],
+                       indices: Optional[list[int]] = None) -> dict[int, tuple[int, float]]:
+        """
+        Match a pattern against each message separately; same result shape as _scan_corpus.
+
+        If indices is given, only those messages are scanned.
+        """
+        hits = {}
+        for idx in range(len(normalized_texts)) if indices is None else indices:
+            normalized_text = normalized_texts[idx]
+
+            if normalized_text:
+                # Scores only use up to _MAX_SCORED_MATCHES matches, so stop counting there
+                matches = itertools.islice(pattern.finditer(normalized_text), _MAX_SCORED_MATCHES)
+                match = next(matches, None)
+                if match:
+                    first_pos = match.start() / len(normalized_text)
+                    hits[idx] = (1 + sum(1 for _ in matches), first_pos)
+        return hits
+
+    def _hyperscan_candidates(self, database: "hyperscan.Database", normalized_texts: list[str]) -> list[int]:
+        """Return the indexes of messages the prefilter database from _compile_hyperscan may match."""
+        candidates = []
+        for idx, normalized_text in enumerate(normalized_texts):
+            if not normalized_text:
+                continue
+            if not normalized_text.isascii():
+                # Unicode case folding (e.g. "i" vs "ı") differs from Hyperscan; leave it to re
+                candidates.append(idx)
+                continue
+            found = []
+            database.scan(normalized_text.encode('ascii'), match_event_handler=_on_hyperscan_match, context=found)
+            if found:
+                candidates.append(idx)
+        return candidates
+
+    def _hybrid_search(self, query: str, messages: list[dict],
+                       top_k: Optional[int] = None) -> list[tuple[float, dict]]:
         """Combine results from exact and regex search methods."""
         # Get weights for each mode
         hybrid_weights = self.config.get('search', {}).get('hybrid_weights', {})
         logger.info(f"Running hybrid search with weights: {hybrid_weights}")
 
-        # Initialize result tracking
-        all_results = {}
-        msg_scores = defaultdict(float)
-        mode_matches = defaultdict(int)
-
         # Normalize the query to improve matching
         query = query.strip()
 
+        # Build the message columns once so both passes reuse them
+        columns = self._as_soa(messages)
+
+        # Combined scores indexed by message position, and the positions either mode matched
+        combined = [0.0] * len(messages)
+        matched = set()
+
         # Run exact search
         if "exact" in self.search_modes and self.search_modes["exact"].get("enabled", False):
-            exact_results = self._exact_search(query, messages)
-            for score, msg in exact_results:
-                msg_id = msg.get("name", "")
-                if msg_id:
-                    all_results[msg_id] = msg
-                    exact_weight = hybrid_weights.get("exact", 1.0)
-                    msg_scores[msg_id] += score * exact_weight
-                    mode_matches["exact"] += 1
-            logger.info(f"Exact search found {mode_matches['exact']} matches")
+            exact_scores, exact_indices = self._exact_search(query, messages, positional=True, columns=columns)
+            exact_weight = hybrid_weights.get("exact", 1.0)
+            for score, idx in zip(exact_scores, exact_indices):
+                combined[idx] += score * exact_weight
+            matched.update(exact_indices)
+            logger.info(f"Exact search found {len(exact_indices)} matches")
 
         # Run regex search
         if "regex" in self.search_modes and self.search_modes["regex"].get("enabled", False):
-            regex_results = self._regex_search(query, messages)
-            for score, msg in regex_results:
-                msg_id = msg.get("name", "")
-                if msg_id:
-                    all_results[msg_id] = msg
-                    regex_weight = hybrid_weights.get("regex", 1.2)
-                    msg_scores[msg_id] += score * regex_weight
-                    mode_matches["regex"] += 1
-            logger.info(f"Regex search found {mode_matches['regex']} matches")
-
-        # Combine and sort results
-        combined_results = []
-        for msg_id, score in msg_scores.items():
-            combined_results.append((score, all_results[msg_id]))
+            regex_scores, regex_indices = self._regex_search(query, messages, positional=True, columns=columns)
+            regex_weight = hybrid_weights.get("regex", 1.2)
+            for score, idx in zip(regex_scores, regex_indices):
+                combined[idx] += score * regex_weight
+            matched.update(regex_indices)
+            logger.info(f"Regex search found {len(regex_indices)} matches")
 
-        # Sort by combined score (descending)
-        combined_results.sort(key=lambda x: x[0], reverse=True)
+        # Combine and sort results, in message order before ranking
+        combined_results = [(combined[idx], messages[idx]) for idx in sorted(matched)]
 
         total_matches = len(combined_results)
         logger.info(f"Hybrid search found {total_matches} total unique matches")
 
-        return combined_results
+        # Sort by combined score (descending)
+        return _rank(combined_results, top_k)
@@ -1,4 +1,5 @@
 import os
+import re
 import pytest
 import yaml
 from unittest.mock import MagicMock, patch
@@ -88,6 +89,68 @@ class TestRegexSearchSuite:
         results = regex_manager._regex_search(pattern, MESSAGES)
         assert any(text in msg["text"] for _, msg in results)
 
+    def test_contraction_matches_all_forms(self, regex_manager):
+        messages = [
+            {"name": "a", "text": "I didn't see it"},
+            {"name": "b", "text": "We do not ship on Fridays"},
+            {"name": "c", "text": "Unrelated"},
+        ]
+        results = regex_manager._regex_search("Don’t", messages)
+        assert sorted(msg["name"] for _, msg in results) == ["a", "b"]
+
+    def test_match_does_not_span_messages(self, regex_manager):
+        # dot_all is enabled, so a joined corpus would let ".*" run into the next message
+        assert regex_manager._regex_search(r"node.*db", MESSAGES) == []
+
+    def test_anchors_apply_per_message(self, regex_manager):
+        results = regex_manager._regex_search(r"^Release", MESSAGES)
+        assert [msg["name"] for _, msg in results] == ["m4"]
+
+    def test_corpus_follows_in_place_edits(self, regex_manager):
+        messages = [{"name": "a", "text": "build 12 passed"}, {"name": "b", "text": "no numbers"}]
+        assert [msg["name"] for _, msg in regex_manager._regex_search(r"\d+", messages)] == ["a"]
+        messages[0]["text"] = "build passed"
+        messages[1] = {"name": "c", "text": "build 13 failed"}
+        assert [msg["name"] for _, msg in regex_manager._regex_search(r"\d+", messages)] == ["c"]
+
+    @pytest.mark.parametrize("pattern", [r"\d+", r"[a-z]+", r"\[\w+\]", r"e", r"\b", r"x?", r"deploy|", r"[a-z]*"])
+    def test_corpus_scan_matches_per_message_scan(self, regex_manager, pattern):
+        compiled = re.compile(pattern, re.IGNORECASE)
+        # Short texts have fewer matches than the scoring cap, so miscounted empty matches show up
+        messages = MESSAGES + [{"name": "s1", "text": "a"}, {"name": "s2", "text": "Deploy x"},
+                               {"name": "s3", "text": ""}, {"name": "s4", "text": "x"}]
+        normalized_texts = regex_manager._as_soa(messages)[1]
+        hits = regex_manager._scan_messages(compiled, normalized_texts)
+        assert regex_manager._scan_corpus(compiled, normalized_texts) == hits
+        # Counts stop at the scoring cap but otherwise agree with finditer, including empty matches
+        assert {idx: count for idx, (count, _) in hits.items()} == {
+            idx: min(len(list(compiled.finditer(msg["text"]))), 5)
+            for idx, msg in enumerate(messages) if msg["text"] and compiled.search(msg["text"])
+        }
+
+    @pytest.mark.parametrize("pattern", [
+        r"\b[A-Z]{2,}-\d+\b", r"^Release", r"(?<=\[)WARN", r"(\w)\1", r"x{,2}",
+        r"kırmızı", r"KIRMIZI", r"field\svalue", r"field[^\S]value", r"a\Sb",
+    ])
+    def test_hyperscan_prefilter_matches_re(self, regex_manager, monkeypatch, pattern):
+        pytest.importorskip("hyperscan")
+        from src.providers.google_chat.utils import search_manager
+        messages = MESSAGES + [
+            {"name": "u1", "text": "Araba kırmızı renkte"},
+            {"name": "u2", "text": "field\x1fvalue"},
+            {"name": "u3", "text": "a\u180eb"},
+        ]
+        expected = regex_manager._regex_search(pattern, messages)
+        monkeypatch.setattr(search_manager, "_HYPERSCAN_MIN_MESSAGES", 0)
+        assert regex_manager._regex_search(pattern, messages) == expected
+
+    def test_hyperscan_rejects_patterns_with_different_semantics(self):
+        pytest.importorskip("hyperscan")
+        from src.providers.google_chat.utils import search_manager
+        for pattern in [r"kırmızı", r"field\svalue", r"[^\S]", r"\w+", r"[[:alpha:]]", r"a{,2}"]:
+            assert search_manager._compile_hyperscan(pattern, re.IGNORECASE) is None
+        assert search_manager._compile_hyperscan(r"\[ERROR\] \d+", re.IGNORECASE) is not None
+
     def test_invalid_regex_fails_gracefully(self, regex_manager):
         results = regex_manager._regex_search(r"bad(pattern", MESSAGES)
         assert isinstance(results, list) and len(results) == 0
@@ -123,12 +186,14 @@ class TestSearchSortingLogic:
                 }
             }
 
-            exact.return_value = [(0.8, {"name": "msg1"}), (0.6, {"name": "msg2"})]
-            regex.return_value = [(0.9, {"name": "msg2"}), (0.7, {"name": "msg3"})]
+            messages = [{"name": "msg1"}, {"name": "msg2"}, {"name": "msg3"}]
+            exact.return_value = ([0.8, 0.6], [0, 1])
+            regex.return_value = ([0.9, 0.7], [1, 2])
 
-            results = manager._hybrid_search("query", [])
+            results = manager._hybrid_search("query", messages)
             names = [msg["name"] for _, msg in results]
             assert "msg2" in names  # Should be found by both modes
+            assert results[0] == (pytest.approx(0.6 * 1.0 + 0.9 * 1.2), messages[1])
 
 
 class TestFallbackAndErrorHandling:
@@ -156,3 +221,134 @@ class TestFallbackAndErrorHandling:
     def test_missing_config_file_raises(self):
         with pytest.raises(FileNotFoundError):
             SearchManager(config_path="does_not_exist.yaml")
+
+
+class TestNormalizationCache:
+
+    def test_exact_and_regex_share_normalized_text(self):
+        manager = SearchManager()
+        messages = [{"name": "msg1", "text": "I don’t know"}]
+        with patch('src.providers.google_chat.utils.search_manager._normalize',
+                   wraps=lambda text: text.replace('’', "'")) as normalize:
+            manager._exact_search("don't", messages)
+            manager._regex_search("don't", messages)
+            message_calls = [c for c in normalize.call_args_list if c.args == ("I don’t know",)]
+            assert len(message_calls) == 1
+
+    def test_smart_quotes_match_ascii_quotes(self):
+        manager = SearchManager()
+        messages = [{"name": "msg1", "text": "Set “strict” mode"}]
+        assert manager._exact_search('"strict"', messages)
+
+    def test_columns_are_reused_while_messages_are_unchanged(self):
+        manager = SearchManager()
+        messages = [{"name": "msg1", "text": "Don’t"}, {"text": "no name"}]
+        texts, normalized, lowered = manager._as_soa(messages)
+        assert texts == ["Don’t", "no name"]
+        assert lowered == ["don't", "no name"]
+        assert manager._as_soa(messages)[1] is normalized
+        assert manager._as_soa(list(messages))[1] is normalized
+        assert manager._as_soa(messages[:1])[1] is not normalized
+
+    @pytest.mark.parametrize("mode", ["exact", "regex", "hybrid"])
+    def test_columns_are_built_once_per_search(self, mode):
+        manager = SearchManager()
+        with patch.object(manager, "_as_soa", wraps=manager._as_soa) as as_soa:
+            manager.search("deploy", MESSAGES, mode=mode)
+        assert as_soa.call_count == 1
+
+    def test_in_place_edits_are_picked_up(self):
+        manager = SearchManager()
+        messages = [{"name": "msg1", "text": "first draft"}, {"name": "msg2", "text": "second draft"}]
+        assert [msg["name"] for _, msg in manager._exact_search("first", messages)] == ["msg1"]
+        messages[0]["text"] = "final draft"
+        messages[1] = {"name": "msg3", "text": "first place"}
+        assert [msg["name"] for _, msg in manager._exact_search("first", messages)] == ["msg3"]
+
+    def test_edited_message_is_renormalized(self):
+        manager = SearchManager()
+        assert manager._exact_search("first", [{"name": "msg1", "text": "first draft"}])
+        assert not manager._exact_search("first", [{"name": "msg1", "text": "final draft"}])
+
+
+class TestExactAlternatives:
+
+    def test_scores_use_character_positions(self):
+        messages = [{"name": "a", "text": "Привет don't мир don't"}, {"name": "b", "text": "日本 did not"}]
+        results = SearchManager()._exact_search("don't", messages)
+        # Positions are character offsets: "don't" at 7 of 22 chars, "did not" at 3 of 10 chars
+        assert [score for score, _ in results] == pytest.approx([
+            0.6 + 0.2 * 2 + 0.2 * (1.0 - 7 / 23),
+            (0.6 + 0.2 * 1 + 0.2 * (1.0 - 3 / 11)) * 0.9,
+        ])
+
+    def test_empty_query_counts_characters(self):
+        # "".count("") is one more than the length in characters, not in UTF-8 bytes
+        results = SearchManager()._exact_search("", [{"name": "a", "text": "привет"}])
+        assert [score for score, _ in results] == pytest.approx([0.6 + 0.2 * 7 + 0.2 * 1.0])
+
+    @pytest.mark.parametrize("alternatives", [["don't", "didn't", "do not", "did not"], ["ab", "ba", "b"]])
+    @pytest.mark.parametrize("text", ["", "did not see, don't know", "do not do not", "abab", "bab ba", "aba"])
+    def test_alternatives_match_regex_alternation(self, alternatives, text):
+        from src.providers.google_chat.utils import search_manager
+        alternation = re.compile("|".join(f"({re.escape(alt_query)})" for alt_query in alternatives))
+        matches = list(alternation.finditer(text))
+        expected = (matches[0].lastindex - 1, len(matches), matches[0].start()) if matches else None
+        assert search_manager._match_alternatives(alternatives, text) == expected
+
+    def test_leftmost_alternative_is_scored(self):
+        from src.providers.google_chat.utils import search_manager
+        alternatives = ["don't", "didn't", "do not", "did not"]
+        # "did not" comes first, and both forms count towards the matches
+        assert search_manager._match_alternatives(alternatives, "did not see, don't know") == (3, 2, 0)
+
+    def test_contraction_matches_expanded_form(self):
+        manager = SearchManager()
+        messages = [{"name": "a", "text": "We did not ship"}, {"name": "b", "text": "shipped"}]
+        results = manager._exact_search("didn't", messages)
+        assert [msg["name"] for _, msg in results] == ["a"]
+
+    def test_expanded_form_matches_contraction(self):
+        manager = SearchManager()
+        messages = [{"name": "a", "text": "I don't know"}, {"name": "b", "text": "nothing to do"}]
+        results = manager._exact_search("do not", messages)
+        assert [msg["name"] for _, msg in results] == ["a"]
+
+
+class TestTopK:
+
+    MESSAGES = [{"name": f"m{i}", "text": "deploy " * i} for i in range(1, 8)]
+
+    @pytest.mark.parametrize("mode", ["exact", "regex", "hybrid"])
+    def test_top_k_matches_truncated_full_ranking(self, mode):
+        manager = SearchManager()
+        full = manager.search("deploy", self.MESSAGES, mode=mode)
+        assert manager.search("deploy", self.MESSAGES, mode=mode, top_k=3) == full[:3]
+
+    def test_top_k_keeps_order_of_equal_scores(self):
+        manager = SearchManager()
+        messages = [{"name": f"m{i}", "text": "deploy"} for i in range(5)]
+        results = manager._exact_search("deploy", messages, top_k=2)
+        assert [msg["name"] for _, msg in results] == ["m0", "m1"]
+
+
+class TestConfigLoading:
+
+    def test_config_is_parsed_once_and_copied(self):
+        from src.providers.google_chat.utils import search_manager
+        search_manager._load_yaml.cache_clear()
+        with patch('src.providers.google_chat.utils.search_manager.yaml.safe_load',
+                   wraps=yaml.safe_load) as safe_load:
+            first = SearchManager(config_path=SEARCH_CONFIG_YAML_PATH)
+            first.config["search"]["default_mode"] = "regex"
+            second = SearchManager(config_path=SEARCH_CONFIG_YAML_PATH)
+        assert safe_load.call_count == 1
+        assert second.config["search"]["default_mode"] != "regex"
+
+    def test_config_is_reloaded_when_file_changes(self, tmp_path):
+        config_path = tmp_path / "search_config.yaml"
+        config_path.write_text("search:\n  default_mode: exact\n")
+        assert SearchManager(config_path=str(config_path)).get_default_mode() == "exact"
+        config_path.write_text("search:\n  default_mode: regex\n")
+        os.utime(config_path, (0, 0))
+        assert SearchManager(config_path=str(config_path)).get_default_mode() == "regex"